@@ -28,6 +28,7 @@ def setup_macos_libraries():
 setup_macos_libraries()
 
 from markconvert.app import app
+from waitress import serve
 
 
 def open_browser():
@@ -55,9 +56,10 @@ def main():
     # Open browser after a short delay
     Timer(1.5, open_browser).start()
 
-    # Start Flask application
+    # Start Flask application on a multi-threaded WSGI server so a long
+    # import doesn't block other requests
     try:
-        app.run(host='127.0.0.1', port=5000, debug=False)
+        serve(app, host='127.0.0.1', port=5000, threads=8, connection_limit=64)
     except KeyboardInterrupt:
         print("\n\n✅ MarkConvert wurde beendet. Auf Wiedersehen!")
         sys.exit(0)
@@ -1,13 +1,63 @@
 """Flask web application for MarkConvert."""
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 import io
+import orjson
 import traceback
+from pathlib import Path
 from markconvert.converter import converter
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider using orjson for (large) Markdown payloads."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # orjson produces bytes: skip the str round-trip of the default provider
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default),
+            mimetype=self.mimetype
+        )
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 
+# Compress text responses (imported Markdown compresses well)
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/markdown', 'text/html']
+app.config['COMPRESS_LEVEL'] = 4  # Fast gzip level
+app.config['COMPRESS_MIN_SIZE'] = 1024
+Compress(app)
+
+
+def download_response(data: bytes, mimetype: str, download_name: str) -> Response:
+    """
+    Send an exported file to the client as an attachment.
+
+    Args:
+        data: File content
+        mimetype: MIME type of the file
+        download_name: File name offered to the browser
+
+    Returns:
+        Response with the file content
+    """
+    return send_file(
+        io.BytesIO(data),
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=download_name
+    )
+
 
 @app.route('/')
 def index():
@@ -32,17 +82,21 @@ def import_document():
         if file.filename == '':
             return jsonify({'error': 'Keine Datei ausgewählt'}), 400
 
+        # Reject unsupported formats before reading the upload into memory
+        suffix = Path(file.filename).suffix.lower()
+        if suffix not in converter.SUPPORTED_FORMATS:
+            return jsonify({
+                'error': f'Nicht unterstütztes Dateiformat: {suffix or file.filename}. '
+                         f'Unterstützt: {", ".join(sorted(converter.SUPPORTED_FORMATS))}'
+            }), 415
+
         # Read file content
         file_bytes = file.read()
 
         # Check if it's a plain text file
-        filename = file.filename.lower()
-        if filename.endswith('.txt') or filename.endswith('.md'):
+        if suffix in converter.TEXT_FORMATS:
             # Just decode as text
-            try:
-                markdown_text = file_bytes.decode('utf-8')
-            except UnicodeDecodeError:
-                markdown_text = file_bytes.decode('latin-1')
+            markdown_text = converter.decode_text(file_bytes)
         else:
             # Use docling for other formats (PDF, DOCX, etc.)
             markdown_text = converter.import_document_from_bytes(
@@ -74,14 +128,9 @@ def export_markdown():
         data = request.get_json()
         markdown_text = data.get('markdown', '')
 
-        # Create file-like object
-        buffer = io.BytesIO(markdown_text.encode('utf-8'))
-        buffer.seek(0)
-
-        return send_file(
-            buffer,
+        return download_response(
+            markdown_text.encode('utf-8'),
             mimetype='text/markdown',
-            as_attachment=True,
             download_name='dokument.md'
         )
 
@@ -107,14 +156,9 @@ def export_docx():
         # Convert to DOCX
         docx_bytes = converter.export_to_docx(markdown_text)
 
-        # Create file-like object
-        buffer = io.BytesIO(docx_bytes)
-        buffer.seek(0)
-
-        return send_file(
-            buffer,
+        return download_response(
+            docx_bytes,
             mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            as_attachment=True,
             download_name='dokument.docx'
         )
 
@@ -140,14 +184,9 @@ def export_pdf():
         # Convert to PDF
         pdf_bytes = converter.export_to_pdf(markdown_text)
 
-        # Create file-like object
-        buffer = io.BytesIO(pdf_bytes)
-        buffer.seek(0)
-
-        return send_file(
-            buffer,
+        return download_response(
+            pdf_bytes,
             mimetype='application/pdf',
-            as_attachment=True,
             download_name='dokument.pdf'
         )
 
@@ -173,14 +212,9 @@ def export_rtf():
         # Convert to RTF
         rtf_bytes = converter.export_to_rtf(markdown_text)
 
-        # Create file-like object
-        buffer = io.BytesIO(rtf_bytes)
-        buffer.seek(0)
-
-        return send_file(
-            buffer,
+        return download_response(
+            rtf_bytes,
             mimetype='application/rtf',
-            as_attachment=True,
             download_name='dokument.rtf'
         )
 
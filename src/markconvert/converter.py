@@ -1,19 +1,287 @@
 """Document conversion using OpenAI GPT-5 for PDFs/images and Docling for office formats."""
 
+import functools
+import hashlib
 import io
+import logging
 import os
-import tempfile
+import re
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Union, BinaryIO, Optional
+from typing import Callable, Union, BinaryIO, Optional
 
+import charset_normalizer
+from docling.datamodel.base_models import DocumentStream, InputFormat
 from docling.document_converter import DocumentConverter
 from docx import Document
 from docx.shared import Pt
 import markdown
-from weasyprint import HTML
+import mistune
+from weasyprint import CSS, HTML
 
 from markconvert.openai_vision_client import OpenAIVisionClient
 
+logger = logging.getLogger(__name__)
+
+# NULL bytes and control characters except newline, tab, carriage return
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]')
+
+# Inline Markdown formatting: **bold**, *italic*, `code`, [link](url)
+_INLINE_RE = re.compile(r'(\*\*[^*]+\*\*|\*[^*]+\*|`[^`]+`|\[([^\]]+)\]\(([^\)]+)\))')
+
+# Block-level Markdown line, one named group per kind (dispatch via lastgroup);
+# lines that don't match are regular paragraphs
+_LINE_RE = re.compile(
+    r'(?P<heading>(?P<level>#{1,6}) (?P<heading_text>.*))'
+    r'|(?P<bullet>[-*] (?P<bullet_text>.*))'
+    r'|(?P<number>(?P<num>\d+)\. (?P<number_text>.*))'
+    r'|(?P<quote>> (?P<quote_text>.*))'
+)
+_BLOCK_MARKERS = frozenset('#-*>')
+
+
+def _tokenize_lines(markdown_text: str) -> list[tuple[str, int, str]]:
+    """
+    Classify Markdown lines for the line-based exporters.
+
+    Args:
+        markdown_text: Markdown content
+
+    Returns:
+        List of (kind, level, text) tuples where kind is one of 'heading',
+        'bullet', 'number', 'quote', 'empty' or 'paragraph' and level is the
+        heading level or the item number of a numbered list (0 otherwise)
+    """
+    tokens = []
+    for line in markdown_text.split('\n'):
+        line = line.rstrip()
+        if not line:
+            tokens.append(('empty', 0, ''))
+            continue
+
+        # Fast path: most lines can't start with block-level markup
+        first = line[0]
+        if first not in _BLOCK_MARKERS and not first.isdigit():
+            tokens.append(('paragraph', 0, line))
+            continue
+
+        match = _LINE_RE.match(line)
+        if match is None:
+            tokens.append(('paragraph', 0, line))
+            continue
+
+        kind = match.lastgroup
+        if kind == 'heading':
+            level = len(match['level'])
+        elif kind == 'number':
+            level = int(match['num'])
+        else:
+            level = 0
+        tokens.append((kind, level, match[kind + '_text']))
+    return tokens
+
+
+# Minimum language coherence (0-1) for a detected text encoding to be used
+# instead of the Windows-1252 fallback
+_MIN_CHARSET_COHERENCE = 0.1
+
+
+def decode_text(data: bytes) -> str:
+    """
+    Decode the content of a text file, detecting its encoding.
+
+    Args:
+        data: Raw file content
+
+    Returns:
+        Decoded text
+    """
+    # UTF-8 (with or without BOM, ASCII included) is decoded strictly first;
+    # detection on short inputs is unreliable and would misread it
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        pass
+
+    # Only trust the detector when it recognizes the text as a language,
+    # otherwise assume Windows-1252 (the usual legacy encoding here)
+    best = charset_normalizer.from_bytes(data).best()
+    if best is None or best.coherence < _MIN_CHARSET_COHERENCE:
+        return data.decode('cp1252', errors='replace')
+    return str(best)
+
+
+# Markdown parser for PDF export: mistune by default, python-markdown
+# (MARKCONVERT_MARKDOWN_ENGINE=markdown) for fidelity comparisons
+MARKDOWN_ENGINE = os.getenv('MARKCONVERT_MARKDOWN_ENGINE', 'mistune').lower()
+
+# mistune parsers keep no state between calls and can be shared
+_MISTUNE = mistune.create_markdown(
+    escape=False,
+    plugins=['table', 'strikethrough', 'footnotes', 'def_list', 'abbr']
+)
+
+# The python-markdown parser is reset and reused across exports
+_MD = markdown.Markdown(extensions=['extra', 'codehilite', 'tables', 'fenced_code'])
+_MD_LOCK = threading.Lock()
+
+
+def _md_to_html(markdown_text: str) -> str:
+    """Convert Markdown to HTML."""
+    if MARKDOWN_ENGINE != 'markdown':
+        return _MISTUNE(markdown_text)
+
+    # The parser instance is shared and not thread-safe
+    with _MD_LOCK:
+        return _MD.reset().convert(markdown_text)
+
+
+# Stylesheet for PDF export, parsed once at import
+_PDF_STYLE = """
+@page {
+    size: A4;
+    margin: 2.5cm;
+}
+body {
+    font-family: 'DejaVu Sans', Arial, sans-serif;
+    font-size: 11pt;
+    line-height: 1.6;
+    color: #333;
+}
+h1 {
+    font-size: 24pt;
+    margin-top: 20pt;
+    margin-bottom: 12pt;
+    border-bottom: 2px solid #333;
+    padding-bottom: 6pt;
+}
+h2 {
+    font-size: 18pt;
+    margin-top: 16pt;
+    margin-bottom: 10pt;
+}
+h3 {
+    font-size: 14pt;
+    margin-top: 12pt;
+    margin-bottom: 8pt;
+}
+p {
+    margin-bottom: 10pt;
+}
+code {
+    background-color: #f4f4f4;
+    padding: 2pt 4pt;
+    border-radius: 3pt;
+    font-family: 'DejaVu Sans Mono', 'Courier New', monospace;
+    font-size: 10pt;
+}
+pre {
+    background-color: #f4f4f4;
+    padding: 12pt;
+    border-radius: 4pt;
+    overflow-x: auto;
+    margin: 10pt 0;
+}
+pre code {
+    background-color: transparent;
+    padding: 0;
+}
+blockquote {
+    border-left: 4pt solid #ddd;
+    padding-left: 12pt;
+    margin-left: 0;
+    font-style: italic;
+    color: #666;
+}
+ul, ol {
+    margin-bottom: 10pt;
+    margin-top: 5pt;
+    padding-left: 30pt;
+    line-height: 1.8;
+}
+li {
+    margin-bottom: 6pt;
+    padding-left: 5pt;
+    break-inside: avoid;
+}
+table {
+    border-collapse: collapse;
+    width: 100%;
+    margin: 10pt 0;
+}
+th, td {
+    border: 1pt solid #ddd;
+    padding: 8pt;
+    text-align: left;
+}
+th {
+    background-color: #f4f4f4;
+    font-weight: bold;
+}
+a {
+    color: #0066cc;
+    text-decoration: none;
+}
+"""
+_PDF_CSS = CSS(string=_PDF_STYLE)
+
+# HTML document shell wrapped around the converted Markdown
+_HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+</head>
+<body>
+"""
+_HTML_TAIL = """
+</body>
+</html>
+"""
+
+# RTF escaping: backslash and braces via translation table, non-ASCII via \uN
+_RTF_TRANS = str.maketrans({'\\': '\\\\', '{': '\\{', '}': '\\}'})
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+
+def _rtf_unicode(match: re.Match) -> str:
+    """Return the RTF \\uN escape(s) for a single non-ASCII character."""
+    code = ord(match.group(0))
+    if code > 0xFFFF:
+        # Outside the BMP (e.g. emojis): UTF-16 surrogate pair
+        code -= 0x10000
+        units = (0xD800 + (code >> 10), 0xDC00 + (code & 0x3FF))
+    else:
+        units = (code,)
+    # \uN takes a signed 16-bit value
+    return ''.join(f'\\u{unit - 65536 if unit > 32767 else unit}?' for unit in units)
+
+
+# RTF header with UTF-8 support
+_RTF_HEADER = (
+    r'{\rtf1\ansi\ansicpg1252\deff0\nouicompat\deflang1033'
+    r'{\fonttbl{\f0\fswiss\fcharset0 Arial;}{\f1\fmodern\fcharset0 Courier New;}}'
+    r'{\colortbl ;\red0\green0\blue0;\red102\green102\blue102;}'
+)
+
+# RTF paragraph (prefix, suffix) formatting per line kind
+_RTF_HEADINGS = {
+    # Headers - reduced spacing (sa100 instead of sa200)
+    1: (r'\pard\sa100\sl240\slmult1\b\fs32 ', r'\b0\fs22\par'),
+    2: (r'\pard\sa100\sl240\slmult1\b\fs28 ', r'\b0\fs22\par'),
+    3: (r'\pard\sa100\sl240\slmult1\b\fs24 ', r'\b0\fs22\par'),
+}
+_RTF_FORMATS = {
+    # Lists - reduced spacing
+    'bullet': (r'\pard\fi-360\li720\sa80\sl240\slmult1 \bullet\tab ', r'\par'),
+    'number': (r'\pard\fi-360\li720\sa80\sl240\slmult1 ', r'\par'),
+    # Blockquote - reduced spacing
+    'quote': (r'\pard\li720\sa100\sl240\slmult1\i ', r'\i0\par'),
+    # Regular paragraph - reduced spacing
+    'paragraph': (r'\pard\sa100\sl240\slmult1 ', r'\par'),
+}
+
 
 class MarkdownConverter:
     """Handle conversion between Markdown and other document formats."""
@@ -27,6 +295,22 @@ class MarkdownConverter:
     # Text formats that don't need processing
     TEXT_FORMATS = {'.txt', '.md'}
 
+    # All file extensions that can be imported
+    SUPPORTED_FORMATS = LLM_FORMATS | DOCLING_FORMATS | TEXT_FORMATS
+
+    # Docling pipelines that are initialized in the background at startup
+    WARMUP_FORMATS = (InputFormat.DOCX, InputFormat.PPTX, InputFormat.HTML)
+
+    # Maximum time (seconds) an import waits for the background warm-up
+    WARMUP_TIMEOUT = 60
+
+    # Number of converted uploads kept in memory (re-uploads skip conversion)
+    IMPORT_CACHE_SIZE = 16
+
+    # Memory budget (bytes) for exported files kept in memory
+    # (re-exports of unchanged Markdown skip rendering)
+    EXPORT_CACHE_BYTES = 32 * 1024 * 1024
+
     def __init__(
         self,
         openai_api_key: str = None,
@@ -48,6 +332,33 @@ class MarkdownConverter:
         # Initialize Docling for office document processing
         self.doc_converter = DocumentConverter()
 
+        # Docling loads its pipelines lazily on the first convert() call.
+        # Warm them up in the background so the first import doesn't stall.
+        self._ready = threading.Event()
+        threading.Thread(target=self._warmup, daemon=True).start()
+
+        # LRU cache of converted uploads, keyed by content hash and suffix
+        self._import_cache: OrderedDict[str, str] = OrderedDict()
+        self._import_cache_lock = threading.Lock()
+
+        # LRU cache of exported files, keyed by format and Markdown hash
+        self._export_cache: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._export_cache_bytes = 0
+        self._export_cache_lock = threading.Lock()
+
+    def _warmup(self):
+        """Initialize the Docling pipelines used for office documents."""
+        start_time = time.time()
+        try:
+            for input_format in self.WARMUP_FORMATS:
+                self.doc_converter.initialize_pipeline(input_format)
+            logger.info(f"Docling pipelines ready in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            # Not fatal: the pipeline is initialized on first use instead
+            logger.warning(f"Docling warm-up failed: {e}")
+        finally:
+            self._ready.set()
+
     def import_document(self, file_path: str) -> str:
         """
         Import a document and convert to Markdown.
@@ -77,40 +388,40 @@ class MarkdownConverter:
 
             # Route 3: Plain text formats → Direct read
             elif suffix in self.TEXT_FORMATS:
-                return file_path.read_text(encoding='utf-8')
+                return self.decode_text(file_path.read_bytes())
 
             else:
                 raise ValueError(
                     f"Unsupported file format: {suffix}. "
-                    f"Supported: {', '.join(sorted(self.LLM_FORMATS | self.DOCLING_FORMATS | self.TEXT_FORMATS))}"
+                    f"Supported: {', '.join(sorted(self.SUPPORTED_FORMATS))}"
                 )
 
         except Exception as e:
             raise ValueError(f"Fehler beim Importieren der Datei: {str(e)}")
 
     def _import_via_llm(self, file_path: Path) -> str:
-        """Import PDF or image via OpenAI GPT-5."""
-        import logging
-        import time
-
-        logger = logging.getLogger(__name__)
-        suffix = file_path.suffix.lower()
+        """Import PDF or image file via OpenAI GPT-5."""
+        return self._import_bytes_via_llm(file_path.read_bytes(), file_path.name)
 
-        if suffix == '.pdf':
+    def _import_bytes_via_llm(self, file_bytes: bytes, filename: str) -> str:
+        """Import PDF or image content via OpenAI GPT-5."""
+        if Path(filename).suffix.lower() == '.pdf':
             # PDF: Send entire PDF to OpenAI for processing (fast!)
             start_time = time.time()
             logger.info(f"Processing PDF with OpenAI GPT-5...")
-            result = self.vision_client.process_pdf(file_path)
+            result = self.vision_client.process_pdf_bytes(file_bytes, filename)
             processing_time = time.time() - start_time
             logger.info(f"PDF processed in {processing_time:.2f}s")
             return result
         else:
             # Image: Process directly
-            return self.vision_client.process_image_to_markdown(file_path)
+            return self.vision_client.process_image_bytes_to_markdown(file_bytes, filename)
 
-    def _import_via_docling(self, file_path: Path) -> str:
-        """Import office document via Docling."""
-        result = self.doc_converter.convert(str(file_path))
+    def _import_via_docling(self, source: Union[Path, DocumentStream]) -> str:
+        """Import office document (file path or in-memory stream) via Docling."""
+        # Don't initialize the pipeline twice if the warm-up is still running
+        self._ready.wait(timeout=self.WARMUP_TIMEOUT)
+        result = self.doc_converter.convert(source)
         return result.document.export_to_markdown()
 
     def import_document_from_bytes(self, file_bytes: bytes, filename: str) -> str:
@@ -124,18 +435,48 @@ class MarkdownConverter:
         Returns:
             Markdown text
         """
-        # Save to temporary file
-        suffix = Path(filename).suffix
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(file_bytes)
-            tmp_path = tmp.name
+        key = hashlib.blake2b(file_bytes).hexdigest() + Path(filename).suffix.lower()
+
+        with self._import_cache_lock:
+            if key in self._import_cache:
+                self._import_cache.move_to_end(key)
+                return self._import_cache[key]
+
+        markdown_text = self._import_bytes(file_bytes, filename)
+
+        with self._import_cache_lock:
+            self._import_cache[key] = markdown_text
+            self._import_cache.move_to_end(key)
+            while len(self._import_cache) > self.IMPORT_CACHE_SIZE:
+                self._import_cache.popitem(last=False)
 
+        return markdown_text
+
+    def _import_bytes(self, file_bytes: bytes, filename: str) -> str:
+        """Convert document bytes to Markdown (routing as in import_document)."""
+        suffix = Path(filename).suffix.lower()
+
+        # Everything is converted in memory, no temporary files
         try:
-            markdown_text = self.import_document(tmp_path)
-            return markdown_text
-        finally:
-            # Clean up temporary file
-            Path(tmp_path).unlink(missing_ok=True)
+            if suffix in self.LLM_FORMATS:
+                return self._import_bytes_via_llm(file_bytes, filename)
+            elif suffix in self.DOCLING_FORMATS:
+                stream = DocumentStream(name=filename, stream=io.BytesIO(file_bytes))
+                return self._import_via_docling(stream)
+            elif suffix in self.TEXT_FORMATS:
+                return self.decode_text(file_bytes)
+            else:
+                raise ValueError(
+                    f"Unsupported file format: {suffix}. "
+                    f"Supported: {', '.join(sorted(self.SUPPORTED_FORMATS))}"
+                )
+
+        except Exception as e:
+            raise ValueError(f"Fehler beim Importieren der Datei: {str(e)}")
+
+    def decode_text(self, data: bytes) -> str:
+        """Decode the content of a text file (see decode_text())."""
+        return decode_text(data)
 
     def _clean_text(self, text: str) -> str:
         """
@@ -147,12 +488,53 @@ class MarkdownConverter:
         Returns:
             Cleaned text
         """
-        import re
         # Remove NULL bytes and control characters except newline, tab, carriage return
         # Keep only printable characters and common whitespace
-        cleaned = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', '', text)
+        cleaned = _CONTROL_CHARS_RE.sub('', text)
         return cleaned
 
+    def _cached_export(
+        self,
+        fmt: str,
+        markdown_text: str,
+        render: Callable[[str], bytes]
+    ) -> bytes:
+        """
+        Return a cached export or render and cache it.
+
+        Args:
+            fmt: Export format (part of the cache key)
+            markdown_text: Markdown content
+            render: Renderer called on a cache miss
+
+        Returns:
+            Exported file as bytes
+        """
+        key = (fmt, hashlib.blake2b(markdown_text.encode('utf-8')).digest())
+
+        with self._export_cache_lock:
+            if key in self._export_cache:
+                self._export_cache.move_to_end(key)
+                return self._export_cache[key]
+
+        data = render(markdown_text)
+
+        # Files larger than the whole budget are not cached
+        if len(data) > self.EXPORT_CACHE_BYTES:
+            return data
+
+        with self._export_cache_lock:
+            previous = self._export_cache.pop(key, None)
+            if previous is not None:
+                self._export_cache_bytes -= len(previous)
+            self._export_cache[key] = data
+            self._export_cache_bytes += len(data)
+            while self._export_cache_bytes > self.EXPORT_CACHE_BYTES:
+                _, evicted = self._export_cache.popitem(last=False)
+                self._export_cache_bytes -= len(evicted)
+
+        return data
+
     def export_to_docx(self, markdown_text: str) -> bytes:
         """
         Export Markdown to DOCX format.
@@ -163,84 +545,77 @@ class MarkdownConverter:
         Returns:
             DOCX file as bytes
         """
+        return self._cached_export('docx', markdown_text, self._render_docx)
+
+    def export_to_docx_stream(self, markdown_text: str) -> io.BytesIO:
+        """
+        Export Markdown to DOCX format as a readable stream.
+
+        Args:
+            markdown_text: Markdown content
+
+        Returns:
+            DOCX file as binary stream positioned at the start
+        """
+        # BytesIO shares the (cached) bytes object instead of copying it
+        return io.BytesIO(self.export_to_docx(markdown_text))
+
+    def _render_docx(self, markdown_text: str) -> bytes:
+        """Render Markdown to DOCX (uncached)."""
         # Clean text from control characters
         markdown_text = self._clean_text(markdown_text)
 
         doc = Document()
 
-        # Parse markdown line by line
-        lines = markdown_text.split('\n')
-
-        for line in lines:
-            line = line.rstrip()
-
-            # Headers
-            if line.startswith('# '):
-                p = doc.add_heading(line[2:], level=1)
-            elif line.startswith('## '):
-                p = doc.add_heading(line[3:], level=2)
-            elif line.startswith('### '):
-                p = doc.add_heading(line[4:], level=3)
-            elif line.startswith('#### '):
-                p = doc.add_heading(line[5:], level=4)
-            elif line.startswith('##### '):
-                p = doc.add_heading(line[6:], level=5)
-            elif line.startswith('###### '):
-                p = doc.add_heading(line[7:], level=6)
-
-            # Lists
-            elif line.startswith('- ') or line.startswith('* '):
-                doc.add_paragraph(line[2:], style='List Bullet')
-            elif len(line) > 2 and line[0].isdigit() and line[1:3] == '. ':
-                doc.add_paragraph(line[3:], style='List Number')
-
-            # Blockquote
-            elif line.startswith('> '):
-                p = doc.add_paragraph(line[2:])
-                p.style = 'Quote'
+        # Style lookups are hoisted out of the loop
+        bullet_style = doc.styles['List Bullet']
+        number_style = doc.styles['List Number']
+        quote_style = doc.styles['Quote']
 
-            # Empty line
-            elif line.strip() == '':
-                doc.add_paragraph()
+        # One handler per line kind: a single dict lookup per line
+        handlers = {
+            'heading': lambda level, text: doc.add_heading(text, level=level),
+            'bullet': lambda level, text: doc.add_paragraph(text, style=bullet_style),
+            'number': lambda level, text: doc.add_paragraph(text, style=number_style),
+            'quote': lambda level, text: doc.add_paragraph(text, style=quote_style),
+            'empty': lambda level, text: doc.add_paragraph(),
+            'paragraph': lambda level, text: self._add_formatted_text(doc.add_paragraph(), text),
+        }
 
-            # Regular paragraph
-            else:
-                p = doc.add_paragraph()
-                self._add_formatted_text(p, line)
+        for kind, level, text in _tokenize_lines(markdown_text):
+            handlers[kind](level, text)
 
         # Save to bytes
         buffer = io.BytesIO()
         doc.save(buffer)
-        buffer.seek(0)
-        return buffer.read()
+        return buffer.getvalue()
 
     def _add_formatted_text(self, paragraph, text: str):
         """Add text with inline formatting (bold, italic, code) to paragraph."""
-        import re
-
-        # Pattern for **bold**, *italic*, `code`, [link](url)
-        pattern = r'(\*\*[^*]+\*\*|\*[^*]+\*|`[^`]+`|\[([^\]]+)\]\(([^\)]+)\))'
-
-        parts = re.split(pattern, text)
+        parts = _INLINE_RE.split(text)
 
         for i, part in enumerate(parts):
             if not part:
                 continue
 
-            if part.startswith('**') and part.endswith('**'):
+            # Dispatch on the leading marker instead of startswith/endswith chains
+            marker = part[:2]
+            head = marker[:1]
+
+            if marker == '**' and len(part) >= 4 and part[-2:] == '**':
                 # Bold
                 run = paragraph.add_run(part[2:-2])
                 run.bold = True
-            elif part.startswith('*') and part.endswith('*') and not part.startswith('**'):
+            elif head == '*' and marker != '**' and part[-1] == '*':
                 # Italic
                 run = paragraph.add_run(part[1:-1])
                 run.italic = True
-            elif part.startswith('`') and part.endswith('`'):
+            elif head == '`' and part[-1] == '`':
                 # Code
                 run = paragraph.add_run(part[1:-1])
                 run.font.name = 'Courier New'
                 run.font.size = Pt(10)
-            elif part.startswith('['):
+            elif head == '[':
                 # This is handled by the regex groups
                 continue
             elif i > 0 and parts[i-1] and parts[i-1].startswith('['):
@@ -261,116 +636,22 @@ class MarkdownConverter:
         Returns:
             PDF file as bytes
         """
+        return self._cached_export('pdf', markdown_text, self._render_pdf)
+
+    def _render_pdf(self, markdown_text: str) -> bytes:
+        """Render Markdown to PDF (uncached)."""
         # Clean text from control characters
         markdown_text = self._clean_text(markdown_text)
 
         # Convert markdown to HTML
-        html_content = markdown.markdown(
-            markdown_text,
-            extensions=['extra', 'codehilite', 'tables', 'fenced_code']
-        )
+        html_content = _md_to_html(markdown_text)
 
-        # Wrap in HTML document with styling
-        full_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                @page {{
-                    size: A4;
-                    margin: 2.5cm;
-                }}
-                body {{
-                    font-family: 'DejaVu Sans', Arial, sans-serif;
-                    font-size: 11pt;
-                    line-height: 1.6;
-                    color: #333;
-                }}
-                h1 {{
-                    font-size: 24pt;
-                    margin-top: 20pt;
-                    margin-bottom: 12pt;
-                    border-bottom: 2px solid #333;
-                    padding-bottom: 6pt;
-                }}
-                h2 {{
-                    font-size: 18pt;
-                    margin-top: 16pt;
-                    margin-bottom: 10pt;
-                }}
-                h3 {{
-                    font-size: 14pt;
-                    margin-top: 12pt;
-                    margin-bottom: 8pt;
-                }}
-                p {{
-                    margin-bottom: 10pt;
-                }}
-                code {{
-                    background-color: #f4f4f4;
-                    padding: 2pt 4pt;
-                    border-radius: 3pt;
-                    font-family: 'DejaVu Sans Mono', 'Courier New', monospace;
-                    font-size: 10pt;
-                }}
-                pre {{
-                    background-color: #f4f4f4;
-                    padding: 12pt;
-                    border-radius: 4pt;
-                    overflow-x: auto;
-                    margin: 10pt 0;
-                }}
-                pre code {{
-                    background-color: transparent;
-                    padding: 0;
-                }}
-                blockquote {{
-                    border-left: 4pt solid #ddd;
-                    padding-left: 12pt;
-                    margin-left: 0;
-                    font-style: italic;
-                    color: #666;
-                }}
-                ul, ol {{
-                    margin-bottom: 10pt;
-                    margin-top: 5pt;
-                    padding-left: 30pt;
-                    line-height: 1.8;
-                }}
-                li {{
-                    margin-bottom: 6pt;
-                    padding-left: 5pt;
-                    break-inside: avoid;
-                }}
-                table {{
-                    border-collapse: collapse;
-                    width: 100%;
-                    margin: 10pt 0;
-                }}
-                th, td {{
-                    border: 1pt solid #ddd;
-                    padding: 8pt;
-                    text-align: left;
-                }}
-                th {{
-                    background-color: #f4f4f4;
-                    font-weight: bold;
-                }}
-                a {{
-                    color: #0066cc;
-                    text-decoration: none;
-                }}
-            </style>
-        </head>
-        <body>
-            {html_content}
-        </body>
-        </html>
-        """
+        # Wrap in HTML document; styling comes from the preparsed stylesheet
+        full_html = _HTML_HEAD + html_content + _HTML_TAIL
 
-        # Convert HTML to PDF
-        pdf_bytes = HTML(string=full_html).write_pdf()
+        # Convert HTML to PDF; WeasyPrint creates a font configuration per
+        # render, which is not safe to share between request threads
+        pdf_bytes = HTML(string=full_html).write_pdf(stylesheets=[_PDF_CSS])
 
         return pdf_bytes
 
@@ -384,83 +665,69 @@ class MarkdownConverter:
         Returns:
             RTF file as bytes
         """
+        return self._cached_export('rtf', markdown_text, self._render_rtf)
+
+    def _render_rtf(self, markdown_text: str) -> bytes:
+        """Render Markdown to RTF (uncached)."""
         # Clean text from control characters
         markdown_text = self._clean_text(markdown_text)
 
-        # RTF header with UTF-8 support
-        rtf = r'{\rtf1\ansi\ansicpg1252\deff0\nouicompat\deflang1033'
-        rtf += r'{\fonttbl{\f0\fswiss\fcharset0 Arial;}{\f1\fmodern\fcharset0 Courier New;}}'
-        rtf += r'{\colortbl ;\red0\green0\blue0;\red102\green102\blue102;}'
-        rtf += '\n'
-
-        lines = markdown_text.split('\n')
-
-        for line in lines:
-            line = line.rstrip()
+        tokens = _tokenize_lines(markdown_text)
 
-            # Convert special characters to RTF unicode
-            line = self._escape_rtf(line)
-
-            # Headers - reduced spacing (sa100 instead of sa200)
-            if line.startswith('# '):
-                rtf += r'\pard\sa100\sl240\slmult1\b\fs32 ' + line[2:] + r'\b0\fs22\par' + '\n'
-            elif line.startswith('## '):
-                rtf += r'\pard\sa100\sl240\slmult1\b\fs28 ' + line[3:] + r'\b0\fs22\par' + '\n'
-            elif line.startswith('### '):
-                rtf += r'\pard\sa100\sl240\slmult1\b\fs24 ' + line[4:] + r'\b0\fs22\par' + '\n'
-
-            # Lists - reduced spacing
-            elif line.startswith('- ') or line.startswith('* '):
-                rtf += r'\pard\fi-360\li720\sa80\sl240\slmult1 ' + r'\bullet\tab ' + line[2:] + r'\par' + '\n'
-            elif len(line) > 2 and line[0].isdigit() and line[1:3] == '. ':
-                # Numbered lists
-                rtf += r'\pard\fi-360\li720\sa80\sl240\slmult1 ' + line + r'\par' + '\n'
-
-            # Blockquote - reduced spacing
-            elif line.startswith('> '):
-                rtf += r'\pard\li720\sa100\sl240\slmult1\i ' + line[2:] + r'\i0\par' + '\n'
+        # Every Markdown line maps to exactly one RTF line: preallocate
+        # header + lines + closing brace and fill by index
+        parts = [None] * (len(tokens) + 2)
+        parts[0] = _RTF_HEADER
+        parts[-1] = '}'
 
+        for i, (kind, level, text) in enumerate(tokens, 1):
             # Empty line
-            elif line.strip() == '':
-                rtf += r'\par' + '\n'
+            if kind == 'empty':
+                parts[i] = r'\par'
+                continue
+
+            # Numbered list: hanging number like the bullet of unordered lists
+            if kind == 'number':
+                start, end = _RTF_FORMATS['number']
+                parts[i] = start + f'{level}.\\tab ' + self._escape_rtf(text) + end
+                continue
 
-            # Regular paragraph - reduced spacing
+            if kind == 'heading':
+                if level in _RTF_HEADINGS:
+                    start, end = _RTF_HEADINGS[level]
+                else:
+                    # Only three heading levels: keep deeper ones as text
+                    start, end = _RTF_FORMATS['paragraph']
+                    text = '#' * level + ' ' + text
             else:
-                rtf += r'\pard\sa100\sl240\slmult1 ' + line + r'\par' + '\n'
+                start, end = _RTF_FORMATS[kind]
 
-        rtf += '}'
+            parts[i] = start + self._escape_rtf(text) + end
 
-        return rtf.encode('utf-8')
+        return '\n'.join(parts).encode('utf-8')
 
     def _escape_rtf(self, text: str) -> str:
         """Escape special characters and convert Unicode to RTF format."""
-        result = []
-
-        for char in text:
-            code = ord(char)
-
-            # ASCII special characters
-            if char == '\\':
-                result.append('\\\\')
-            elif char == '{':
-                result.append('\\{')
-            elif char == '}':
-                result.append('\\}')
-            # Unicode characters (including emojis)
-            elif code > 127:
-                result.append(f'\\u{code}?')
-            else:
-                result.append(char)
-
-        return ''.join(result)
+        return _NON_ASCII_RE.sub(_rtf_unicode, text.translate(_RTF_TRANS))
 
 
-# Global converter instance
+# Global converter instance, created on first access so that importing this
+# module doesn't set up the OpenAI client and Docling
 # Use environment variables for configuration
 # OpenAI API key from OPENAI_API_KEY env var
 openai_model = os.getenv('OPENAI_MODEL', 'gpt-5-nano')
 
-converter = MarkdownConverter(
-    openai_api_key=None,  # Uses OPENAI_API_KEY env var
-    openai_model=openai_model
-)
+
+@functools.lru_cache(maxsize=None)
+def _get_converter() -> MarkdownConverter:
+    """Create the global converter instance."""
+    return MarkdownConverter(
+        openai_api_key=None,  # Uses OPENAI_API_KEY env var
+        openai_model=openai_model
+    )
+
+
+def __getattr__(name: str):
+    if name == 'converter':
+        return _get_converter()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
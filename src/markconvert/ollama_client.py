@@ -1,20 +1,61 @@
 """Ollama client for vision and text processing."""
 
 import base64
+import hashlib
 import json
+import os
+import re
+import tempfile
 from pathlib import Path
 from typing import Optional, Union, List
 import requests
+from requests.adapters import HTTPAdapter
+
+# Part of the result cache key: bump whenever the classification,
+# transcription or description prompts change
+PROMPT_VERSION = b"1"
+
+# Code fence markers LLMs wrap their output in: an opening ```markdown or
+# ```<lang> line, a closing ``` at the very end, and standalone ``` or
+# ```markdown lines anywhere in between
+_FENCE_RE = re.compile(
+    r'\A```(?:markdown|[^\n]*\n)'
+    r'|```\Z'
+    r'|^[^\S\n]*```(?:markdown)?[^\S\n]*$\n?',
+    re.MULTILINE
+)
+
+# Leading base64 characters of common image formats (for data URLs)
+_B64_MIME_PREFIXES = (
+    ("/9j/", "image/jpeg"),
+    ("iVBORw0KGgo", "image/png"),
+    ("R0lGOD", "image/gif"),
+    ("UklGR", "image/webp"),
+)
+
+
+def _b64_mime_type(image_b64: str) -> str:
+    """Detect the MIME type of a base64-encoded image (defaults to JPEG)."""
+    for prefix, mime_type in _B64_MIME_PREFIXES:
+        if image_b64.startswith(prefix):
+            return mime_type
+    return "image/jpeg"
 
 
 class OllamaClient:
     """Client for interacting with Ollama API."""
 
+    # Keep-alive connections kept open to the server (concurrent page requests)
+    POOL_SIZE = 16
+
     def __init__(
         self,
         base_url: str = "http://localhost:11434",
         model: str = "gemma3:27b",
-        vision_model: Optional[str] = None
+        vision_model: Optional[str] = None,
+        cache_dir: Union[Path, str, None, bool] = None,
+        stream: bool = False,
+        use_openai_compat: bool = False
     ):
         """
         Initialize Ollama client.
@@ -23,15 +64,140 @@ class OllamaClient:
             base_url: Ollama server URL
             model: Default model for text processing
             vision_model: Model for vision tasks (defaults to qwen2.5vl:32b if available)
+            cache_dir: Directory for cached image results
+                (defaults to $XDG_CACHE_HOME/markconvert or ~/.cache/markconvert;
+                False disables the cache). Entries are never evicted: the
+                directory grows with every distinct image and has to be
+                cleared manually.
+            stream: Receive responses incrementally instead of in one piece
+            use_openai_compat: Use the OpenAI-compatible /v1/chat/completions
+                endpoint (e.g. behind a proxy) instead of /api/generate
         """
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.vision_model = vision_model or "qwen2.5vl:32b"
 
+        if cache_dir is None:
+            cache_dir = Path(os.getenv("XDG_CACHE_HOME", "~/.cache")).expanduser() / "markconvert"
+        self.cache_dir: Optional[Path] = None if cache_dir is False else Path(cache_dir)
+
+        self.stream = stream
+        self.use_openai_compat = use_openai_compat
+
+        # Reuse HTTP connections (keep-alive) across requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def _encode(self, data: bytes) -> str:
+        """Encode image bytes to base64 (ASCII output, no UTF-8 validation needed)."""
+        return base64.b64encode(data).decode('ascii')
+
     def _encode_image(self, image_path: Union[str, Path]) -> str:
-        """Encode image to base64."""
-        with open(image_path, 'rb') as f:
-            return base64.b64encode(f.read()).decode('utf-8')
+        """Encode image file to base64."""
+        return self._encode(Path(image_path).read_bytes())
+
+    def _generate(self, payload: dict) -> str:
+        """
+        Send a request to the generate endpoint.
+
+        Args:
+            payload: Request payload (without "stream")
+
+        Returns:
+            Generated text
+        """
+        if self.use_openai_compat:
+            return self._chat_completion(payload)
+
+        if self.stream:
+            return self._post_stream(payload)
+
+        payload["stream"] = False
+        response = self._session.post(
+            f"{self.base_url}/api/generate",
+            json=payload,
+            timeout=300
+        )
+        response.raise_for_status()
+
+        result = response.json()
+        return result.get("response", "")
+
+    def _chat_completion(self, payload: dict) -> str:
+        """
+        Send a generate payload to the OpenAI-compatible chat endpoint.
+
+        Images are passed as data URLs, so the base64 strings are reused
+        as-is without decoding or re-encoding.
+
+        Args:
+            payload: Request payload in /api/generate format
+
+        Returns:
+            Generated text
+        """
+        content = [{"type": "text", "text": payload["prompt"]}]
+        for image_b64 in payload.get("images", ()):
+            content.append({
+                "type": "image_url",
+                "image_url": {"url": f"data:{_b64_mime_type(image_b64)};base64,{image_b64}"}
+            })
+
+        messages = []
+        if payload.get("system"):
+            messages.append({"role": "system", "content": payload["system"]})
+        messages.append({"role": "user", "content": content})
+
+        response = self._session.post(
+            f"{self.base_url}/v1/chat/completions",
+            json={
+                "model": payload["model"],
+                "messages": messages,
+                "temperature": payload["options"]["temperature"],
+                "stream": False
+            },
+            timeout=300
+        )
+        response.raise_for_status()
+
+        result = response.json()
+        return result["choices"][0]["message"]["content"] or ""
+
+    def _post_stream(self, payload: dict) -> str:
+        """
+        Send a streaming request and assemble the response chunks.
+
+        Args:
+            payload: Request payload (without "stream")
+
+        Returns:
+            Generated text
+        """
+        payload["stream"] = True
+        parts = []
+
+        with self._session.post(
+            f"{self.base_url}/api/generate",
+            json=payload,
+            stream=True,
+            timeout=300
+        ) as response:
+            response.raise_for_status()
+
+            # One JSON object per line until "done"
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                parts.append(chunk.get("response", ""))
+                if chunk.get("done"):
+                    break
+
+        return ''.join(parts)
 
     def generate_text(
         self,
@@ -57,7 +223,6 @@ class OllamaClient:
         payload = {
             "model": model,
             "prompt": prompt,
-            "stream": False,
             "options": {
                 "temperature": temperature
             }
@@ -66,33 +231,27 @@ class OllamaClient:
         if system:
             payload["system"] = system
 
-        response = requests.post(
-            f"{self.base_url}/api/generate",
-            json=payload,
-            timeout=300
-        )
-        response.raise_for_status()
-
-        result = response.json()
-        return result.get("response", "")
+        return self._generate(payload)
 
     def analyze_image(
         self,
-        image_path: Union[str, Path],
+        image_path: Optional[Union[str, Path]],
         prompt: str,
         model: Optional[str] = None,
         system: Optional[str] = None,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        image_b64: Optional[str] = None
     ) -> str:
         """
         Analyze image with vision model.
 
         Args:
-            image_path: Path to image file
+            image_path: Path to image file (unused if image_b64 is given)
             prompt: Analysis prompt
             model: Vision model to use (defaults to self.vision_model)
             system: System prompt
             temperature: Sampling temperature
+            image_b64: Already base64-encoded image (skips reading image_path)
 
         Returns:
             Analysis result
@@ -100,13 +259,13 @@ class OllamaClient:
         model = model or self.vision_model
 
         # Encode image
-        image_b64 = self._encode_image(image_path)
+        if image_b64 is None:
+            image_b64 = self._encode_image(image_path)
 
         payload = {
             "model": model,
             "prompt": prompt,
             "images": [image_b64],
-            "stream": False,
             "options": {
                 "temperature": temperature
             }
@@ -115,22 +274,19 @@ class OllamaClient:
         if system:
             payload["system"] = system
 
-        response = requests.post(
-            f"{self.base_url}/api/generate",
-            json=payload,
-            timeout=300
-        )
-        response.raise_for_status()
+        return self._generate(payload)
 
-        result = response.json()
-        return result.get("response", "")
-
-    def classify_image_content(self, image_path: Union[str, Path]) -> str:
+    def classify_image_content(
+        self,
+        image_path: Optional[Union[str, Path]],
+        image_b64: Optional[str] = None
+    ) -> str:
         """
         Classify if image contains document/table/chart or photo/artwork.
 
         Args:
-            image_path: Path to image
+            image_path: Path to image (unused if image_b64 is given)
+            image_b64: Already base64-encoded image (skips reading image_path)
 
         Returns:
             "document" or "photo"
@@ -155,7 +311,8 @@ Respond with ONLY ONE WORD: either "document" or "photo"."""
         result = self.analyze_image(
             image_path,
             prompt=prompt,
-            temperature=0.0  # Deterministic for classification
+            temperature=0.0,  # Deterministic for classification
+            image_b64=image_b64
         )
 
         # Extract classification from response
@@ -168,12 +325,17 @@ Respond with ONLY ONE WORD: either "document" or "photo"."""
             # Default to document if unclear
             return "document"
 
-    def transcribe_document(self, image_path: Union[str, Path]) -> str:
+    def transcribe_document(
+        self,
+        image_path: Optional[Union[str, Path]],
+        image_b64: Optional[str] = None
+    ) -> str:
         """
         Transcribe document image to Markdown.
 
         Args:
-            image_path: Path to document image
+            image_path: Path to document image (unused if image_b64 is given)
+            image_b64: Already base64-encoded image (skips reading image_path)
 
         Returns:
             Markdown transcription
@@ -201,15 +363,21 @@ Output the transcription in valid Markdown format."""
             image_path,
             prompt=user_prompt,
             system=system_prompt,
-            temperature=0.1  # Low temperature for accurate transcription
+            temperature=0.1,  # Low temperature for accurate transcription
+            image_b64=image_b64
         )
 
-    def describe_image(self, image_path: Union[str, Path]) -> str:
+    def describe_image(
+        self,
+        image_path: Optional[Union[str, Path]],
+        image_b64: Optional[str] = None
+    ) -> str:
         """
         Generate detailed description of photo/image.
 
         Args:
-            image_path: Path to image
+            image_path: Path to image (unused if image_b64 is given)
+            image_b64: Already base64-encoded image (skips reading image_path)
 
         Returns:
             Markdown description
@@ -231,7 +399,8 @@ Provide a clear, structured description in Markdown format."""
             image_path,
             prompt=user_prompt,
             system=system_prompt,
-            temperature=0.3  # Slightly higher for creative descriptions
+            temperature=0.3,  # Slightly higher for creative descriptions
+            image_b64=image_b64
         )
 
     def _remove_markdown_code_blocks(self, text: str) -> str:
@@ -246,36 +415,32 @@ Provide a clear, structured description in Markdown format."""
         Returns:
             Cleaned text without code block wrappers
         """
-        import re
-
-        text = text.strip()
-
-        # Remove code block wrappers at start and end
-        if text.startswith('```markdown'):
-            text = text[len('```markdown'):].lstrip('\n')
-        elif text.startswith('```'):
-            first_newline = text.find('\n')
-            if first_newline != -1:
-                text = text[first_newline + 1:].lstrip('\n')
-
-        if text.endswith('```'):
-            text = text[:-3].rstrip('\n')
-
-        # Remove all standalone ``` lines (code block markers)
-        # This handles cases where LLM adds ``` in the middle
-        lines = text.split('\n')
-        cleaned_lines = []
-
-        for line in lines:
-            stripped = line.strip()
-            # Skip lines that are just code block markers
-            if stripped == '```' or stripped == '```markdown':
-                continue
-            cleaned_lines.append(line)
-
-        text = '\n'.join(cleaned_lines)
-
-        return text.strip()
+        return _FENCE_RE.sub('', text.strip()).strip()
+
+    def _cache_path(self, image_bytes: bytes) -> Optional[Path]:
+        """Return the cache file for an image, keyed by content, model and prompts."""
+        if self.cache_dir is None:
+            return None
+        hasher = hashlib.blake2b(image_bytes)
+        hasher.update(self.vision_model.encode('utf-8'))
+        hasher.update(PROMPT_VERSION)
+        key = hasher.hexdigest()
+        return self.cache_dir / key[:2] / key
+
+    def _write_cache(self, cache_path: Path, text: str):
+        """Atomically store a result in the cache (failures are not fatal)."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+        except OSError:
+            pass
 
     def process_image_to_markdown(self, image_path: Union[str, Path]) -> str:
         """
@@ -283,22 +448,53 @@ Provide a clear, structured description in Markdown format."""
         1. Classify content type
         2. Either transcribe document or describe photo
 
+        Results are cached on disk, so identical images are only sent to
+        the vision model once (unless the cache is disabled).
+
         Args:
             image_path: Path to image
 
         Returns:
             Markdown output (cleaned of code block wrappers)
         """
+        return self.process_image_bytes_to_markdown(Path(image_path).read_bytes())
+
+    def process_image_bytes_to_markdown(self, image_bytes: bytes) -> str:
+        """
+        Process image content to Markdown (see process_image_to_markdown).
+
+        Args:
+            image_bytes: Image content
+
+        Returns:
+            Markdown output (cleaned of code block wrappers)
+        """
+        # Step 0: Return cached result for identical image, model and prompts
+        cache_path = self._cache_path(image_bytes)
+        if cache_path is not None:
+            try:
+                return cache_path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                # Not cached (or unreadable): ask the model
+                pass
+
+        # Encode once for both requests
+        image_b64 = self._encode(image_bytes)
+
         # Step 1: Classify
-        content_type = self.classify_image_content(image_path)
+        content_type = self.classify_image_content(None, image_b64=image_b64)
 
         # Step 2: Process based on classification
         if content_type == "document":
-            result = self.transcribe_document(image_path)
+            result = self.transcribe_document(None, image_b64=image_b64)
         else:
             # Wrap description in Markdown format
-            description = self.describe_image(image_path)
+            description = self.describe_image(None, image_b64=image_b64)
             result = f"# Image Description\n\n{description}"
 
         # Step 3: Clean up code block wrappers
-        return self._remove_markdown_code_blocks(result)
+        result = self._remove_markdown_code_blocks(result)
+
+        if cache_path is not None:
+            self._write_cache(cache_path, result)
+        return result
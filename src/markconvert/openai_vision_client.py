@@ -3,7 +3,7 @@
 import base64
 import os
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
 from openai import OpenAI
 
@@ -30,45 +30,59 @@ class OpenAIVisionClient:
         self.client = OpenAI(api_key=self.api_key)
         self.model = model
 
-    def _encode_image(self, image_path: Union[str, Path]) -> tuple[str, str]:
+    # MIME types of the supported image suffixes
+    MIME_TYPES = {
+        '.png': 'image/png',
+        '.jpg': 'image/jpeg',
+        '.jpeg': 'image/jpeg',
+        '.gif': 'image/gif',
+        '.webp': 'image/webp'
+    }
+
+    def _encode(self, data: bytes, filename: str) -> tuple[str, str]:
         """
-        Encode image to base64.
+        Encode image bytes to base64.
 
         Args:
-            image_path: Path to image file
+            data: Image content
+            filename: Image file name (for the MIME type)
 
         Returns:
             Tuple of (base64_string, mime_type)
         """
-        image_path = Path(image_path)
+        mime_type = self.MIME_TYPES.get(Path(filename).suffix.lower(), 'image/jpeg')
+        return base64.b64encode(data).decode('ascii'), mime_type
 
-        # Determine MIME type
-        suffix = image_path.suffix.lower()
-        mime_types = {
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp'
-        }
-        mime_type = mime_types.get(suffix, 'image/jpeg')
+    def _encode_image(self, image_path: Union[str, Path]) -> tuple[str, str]:
+        """
+        Encode image file to base64.
 
-        with open(image_path, 'rb') as f:
-            b64 = base64.b64encode(f.read()).decode('utf-8')
+        Args:
+            image_path: Path to image file
 
-        return b64, mime_type
+        Returns:
+            Tuple of (base64_string, mime_type)
+        """
+        image_path = Path(image_path)
+        return self._encode(image_path.read_bytes(), image_path.name)
 
-    def classify_image_content(self, image_path: Union[str, Path]) -> str:
+    def classify_image_content(
+        self,
+        image_path: Optional[Union[str, Path]],
+        encoded_image: Optional[tuple[str, str]] = None
+    ) -> str:
         """
         Classify if image contains document/table/chart or photo/artwork.
 
         Args:
-            image_path: Path to image
+            image_path: Path to image (unused if encoded_image is given)
+            encoded_image: (base64_string, mime_type) from _encode_image
+                (skips reading image_path)
 
         Returns:
             "document" or "photo"
         """
-        b64, mime_type = self._encode_image(image_path)
+        b64, mime_type = encoded_image or self._encode_image(image_path)
 
         prompt = """Analysiere dieses Bild und klassifiziere es in eine der beiden Kategorien:
 
@@ -110,17 +124,23 @@ Antworte mit NUR EINEM WORT: entweder "document" oder "photo"."""
         else:
             return "document"  # Default
 
-    def transcribe_document(self, image_path: Union[str, Path]) -> str:
+    def transcribe_document(
+        self,
+        image_path: Optional[Union[str, Path]],
+        encoded_image: Optional[tuple[str, str]] = None
+    ) -> str:
         """
         Transcribe document image to Markdown.
 
         Args:
-            image_path: Path to document image
+            image_path: Path to document image (unused if encoded_image is given)
+            encoded_image: (base64_string, mime_type) from _encode_image
+                (skips reading image_path)
 
         Returns:
             Markdown transcription
         """
-        b64, mime_type = self._encode_image(image_path)
+        b64, mime_type = encoded_image or self._encode_image(image_path)
 
         prompt = """Transkribiere dieses Dokumentenbild zu Markdown-Format.
 
@@ -155,17 +175,23 @@ WICHTIG: Gib NUR das Markdown aus, keine zusätzlichen Erklärungen oder Komment
 
         return resp.output_text.strip()
 
-    def describe_image(self, image_path: Union[str, Path]) -> str:
+    def describe_image(
+        self,
+        image_path: Optional[Union[str, Path]],
+        encoded_image: Optional[tuple[str, str]] = None
+    ) -> str:
         """
         Generate detailed description of photo/image.
 
         Args:
-            image_path: Path to image
+            image_path: Path to image (unused if encoded_image is given)
+            encoded_image: (base64_string, mime_type) from _encode_image
+                (skips reading image_path)
 
         Returns:
             Markdown description
         """
-        b64, mime_type = self._encode_image(image_path)
+        b64, mime_type = encoded_image or self._encode_image(image_path)
 
         prompt = """Beschreibe dieses Bild detailliert.
 
@@ -206,9 +232,20 @@ Gib eine klare, strukturierte Beschreibung in Markdown-Format."""
             Markdown transcription
         """
         pdf_path = Path(pdf_path)
+        return self.process_pdf_bytes(pdf_path.read_bytes(), pdf_path.name)
 
-        with open(pdf_path, 'rb') as f:
-            b64 = base64.b64encode(f.read()).decode('utf-8')
+    def process_pdf_bytes(self, pdf_bytes: bytes, filename: str) -> str:
+        """
+        Process PDF content to Markdown without touching the file system.
+
+        Args:
+            pdf_bytes: PDF content
+            filename: Original file name (sent along with the document)
+
+        Returns:
+            Markdown transcription
+        """
+        b64 = base64.b64encode(pdf_bytes).decode('ascii')
 
         prompt = """Transkribiere dieses PDF-Dokument zu Markdown-Format.
 
@@ -235,7 +272,7 @@ WICHTIG: Gib NUR das Markdown aus, keine zusätzlichen Erklärungen oder Komment
                     {
                         "type": "input_file",
                         "file_data": f"data:application/pdf;base64,{b64}",
-                        "filename": pdf_path.name
+                        "filename": filename
                     }
                 ]
             }]
@@ -255,13 +292,30 @@ WICHTIG: Gib NUR das Markdown aus, keine zusätzlichen Erklärungen oder Komment
         Returns:
             Markdown output
         """
+        image_path = Path(image_path)
+        return self.process_image_bytes_to_markdown(image_path.read_bytes(), image_path.name)
+
+    def process_image_bytes_to_markdown(self, image_bytes: bytes, filename: str) -> str:
+        """
+        Process image content to Markdown (see process_image_to_markdown).
+
+        Args:
+            image_bytes: Image content
+            filename: Original file name (for the MIME type)
+
+        Returns:
+            Markdown output
+        """
+        # Encode once for both requests
+        encoded_image = self._encode(image_bytes, filename)
+
         # Step 1: Classify
-        content_type = self.classify_image_content(image_path)
+        content_type = self.classify_image_content(None, encoded_image=encoded_image)
 
         # Step 2: Process based on classification
         if content_type == "document":
-            return self.transcribe_document(image_path)
+            return self.transcribe_document(None, encoded_image=encoded_image)
         else:
             # Wrap description in Markdown format
-            description = self.describe_image(image_path)
+            description = self.describe_image(None, encoded_image=encoded_image)
             return f"# Bildbeschreibung\n\n{description}"
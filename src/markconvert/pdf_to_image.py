@@ -1,103 +1,508 @@
 """Convert PDF pages to images for LLM processing."""
 
+import contextlib
+import functools
+import io
+import math
+import mmap
+import os
+import queue
+import shutil
+import subprocess
 import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Union, Optional
+from typing import BinaryIO, Callable, Iterator, List, Literal, Union, Optional
 import fitz  # PyMuPDF
 from PIL import Image
 
+try:
+    # Optional: libjpeg-turbo SIMD JPEG encoder (pip install markconvert[turbojpeg])
+    import numpy as np
+    from turbojpeg import TJPF_RGB, TJSAMP_420, TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+# JPEG encoder backends ("auto": turbojpeg if installed, else pillow)
+JpegEncoder = Literal["auto", "pillow", "turbojpeg", "jpegli"]
+
+# A PDF given as file path, raw bytes or binary stream (e.g. io.BytesIO)
+PdfSource = Union[str, Path, bytes, BinaryIO]
+
+
+@contextlib.contextmanager
+def _open_pdf(pdf: PdfSource) -> Iterator[fitz.Document]:
+    """
+    Open a PDF from a path or from memory and close it afterwards.
+
+    Files are memory-mapped: MuPDF parses them straight from the page cache
+    instead of through buffered reads.
+    """
+    if isinstance(pdf, (str, Path)):
+        with open(pdf, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Can't map empty files: let MuPDF report the error
+                mapped = None
+                doc = fitz.open(pdf)
+            else:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                view = memoryview(mapped)
+                try:
+                    doc = fitz.open(stream=view, filetype="pdf")
+                except Exception:
+                    # Unreadable PDF: unmap before reporting the error
+                    view.release()
+                    mapped.close()
+                    raise
+                # The document keeps the only reference to the view
+                del view
+    else:
+        mapped = None
+        if not isinstance(pdf, bytes):
+            pdf = pdf.read()
+        doc = fitz.open(stream=pdf, filetype="pdf")
+
+    try:
+        yield doc
+    finally:
+        doc.close()
+        if mapped is not None:
+            # The document still references the view; drop it before unmapping
+            doc.stream = None
+            mapped.close()
+
+
+def _prepare_output_dir(output_dir: Optional[Path]) -> Path:
+    """Create the output directory (a new temp dir if None)."""
+    if output_dir is None:
+        return Path(tempfile.mkdtemp(prefix="pdf_images_"))
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
+
+
+@functools.lru_cache(maxsize=None)
+def _get_turbojpeg() -> Optional["TurboJPEG"]:
+    """Return the process-wide TurboJPEG encoder, or None if unavailable."""
+    if TurboJPEG is None:
+        return None
+    try:
+        return TurboJPEG()
+    except (OSError, RuntimeError):
+        # Python binding installed but libturbojpeg not found
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _zoom_matrix(zoom: float) -> fitz.Matrix:
+    """Return the (shared, not to be modified) scaling matrix for a zoom factor."""
+    return fitz.Matrix(zoom, zoom)
+
+
+def _render_chunk(
+    converter: "PdfToImageConverter",
+    pdf: Union[str, Path, bytes],
+    first: int,
+    last: int,
+    output_dir: Optional[Path]
+) -> Union[List[Path], List[bytes]]:
+    """Render pages first..last-1 in a worker process (own document handle)."""
+    with _open_pdf(pdf) as doc:
+        return converter._convert_pages(doc, range(first, last), output_dir)
+
 
 class PdfToImageConverter:
     """Convert PDF pages to images."""
 
+    # Pages per worker process below which parallel rendering doesn't pay off
+    MIN_PAGES_PER_WORKER = 4
+
+    # Pages iter_pdf_pages renders ahead of the caller
+    PREFETCH_PAGES = 2
+
+    # Rendering settings bound into the page encoder at construction;
+    # they are read-only afterwards
+    FROZEN_SETTINGS = frozenset({
+        "dpi", "zoom", "output_format", "jpeg_quality", "max_dimension",
+        "resampling_filter", "jpeg_optimize", "png_compress_level", "encoder"
+    })
+
     def __init__(
         self,
-        dpi: int = 150,
+        dpi: int = 100,
         output_format: str = "jpeg",
         jpeg_quality: int = 85,
-        max_dimension: int = 2048
+        max_dimension: int = 2048,
+        max_workers: Optional[int] = None,
+        resampling_filter: Image.Resampling = Image.Resampling.LANCZOS,
+        jpeg_optimize: bool = False,
+        png_compress_level: int = 1,
+        encoder: JpegEncoder = "auto"
     ):
         """
         Initialize PDF to image converter.
 
         Args:
-            dpi: Resolution for image conversion (default: 150 DPI - good balance)
+            dpi: Resolution for image conversion (default: 100 DPI - enough for
+                vision LLMs; small print gets blurry below ~96 DPI). Pages
+                exceeding max_dimension are rendered at a lower resolution.
             output_format: 'jpeg' or 'png' (jpeg is faster and uses fewer tokens)
             jpeg_quality: JPEG quality 1-100 (default: 85 - good quality, smaller files)
             max_dimension: Maximum width or height in pixels (downscale if larger)
+            max_workers: Processes rendering pages in parallel
+                (default: number of CPUs, at most 4; 1 renders in-process)
+            resampling_filter: Filter for downscaling oversized pages
+            jpeg_optimize: Compute optimal Huffman tables (a few percent smaller
+                JPEGs at a noticeably slower encode; off by default)
+            png_compress_level: zlib level 0-9 for PNG output (default: 1 -
+                fast; raise for smaller files)
+            encoder: JPEG encoder - 'pillow', 'turbojpeg' (libjpeg-turbo, fastest),
+                'jpegli' (cjpegli binary, ~35% smaller files for size-limited
+                APIs) or 'auto' (turbojpeg if installed, else pillow)
         """
         self.dpi = dpi
         self.zoom = dpi / 72  # PDF default is 72 DPI
         self.output_format = output_format.lower()
         self.jpeg_quality = jpeg_quality
         self.max_dimension = max_dimension
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 4)
+        self.resampling_filter = resampling_filter
+        self.jpeg_optimize = jpeg_optimize
+        self.png_compress_level = png_compress_level
+
+        if encoder == "auto":
+            encoder = "turbojpeg" if _get_turbojpeg() is not None else "pillow"
+        elif encoder == "turbojpeg" and _get_turbojpeg() is None:
+            raise ValueError("turbojpeg encoder requires PyTurboJPEG and libturbojpeg")
+        elif encoder == "jpegli":
+            # Only needed for JPEG output
+            self._cjpegli = shutil.which("cjpegli")
+            if self._cjpegli is None and self.output_format == "jpeg":
+                raise ValueError("jpegli encoder requires the cjpegli binary on PATH")
+        elif encoder != "pillow":
+            raise ValueError(f"Unknown JPEG encoder: {encoder}")
+        self.encoder = encoder
+
+        # Settings are bound into the encoder once; it is rebuilt after pickling
+        self._encode_pixmap = self._make_encoder()
+
+    def __setattr__(self, name, value):
+        if name in self.FROZEN_SETTINGS and name in self.__dict__:
+            raise AttributeError(
+                f"{name} is fixed at construction; create a new PdfToImageConverter"
+            )
+        super().__setattr__(name, value)
+
+    def __getstate__(self) -> dict:
+        # Closures cannot be pickled for the worker processes
+        state = self.__dict__.copy()
+        del state["_encode_pixmap"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._encode_pixmap = self._make_encoder()
+
+    def _page_path(self, output_dir: Path, page_num: int) -> Path:
+        """Return the image path for a page (0-indexed)."""
+        ext = "jpg" if self.output_format == "jpeg" else "png"
+        return output_dir / f"page_{page_num + 1:04d}.{ext}"
+
+    def _convert_pages(
+        self,
+        doc: fitz.Document,
+        page_nums: range,
+        output_dir: Optional[Path]
+    ) -> Union[List[Path], List[bytes]]:
+        """Convert pages to files in output_dir, or to bytes if it is None."""
+        if output_dir is None:
+            return [self._encode_page(doc[page_num]) for page_num in page_nums]
+        return self._write_pages(doc, page_nums, output_dir)
+
+    def _write_pages(self, doc: fitz.Document, page_nums: range, output_dir: Path) -> List[Path]:
+        """
+        Render pages and save them as images in output_dir.
+
+        Files are written by a background thread, so each write overlaps
+        with rendering the next page. At most one write is outstanding to
+        keep memory bounded.
+
+        Args:
+            doc: Open PDF document
+            page_nums: Pages to convert (0-indexed)
+            output_dir: Directory to save images
+
+        Returns:
+            List of paths to generated images
+        """
+        image_paths = []
+        pending: Optional[Future] = None
+
+        with ThreadPoolExecutor(max_workers=1) as io_pool:
+            for page_num in page_nums:
+                data = self._encode_page(doc[page_num])
+                image_path = self._page_path(output_dir, page_num)
+
+                if pending is not None:
+                    pending.result()
+                pending = io_pool.submit(image_path.write_bytes, data)
+                image_paths.append(image_path)
+
+            if pending is not None:
+                pending.result()
+
+        return image_paths
+
+    def _encode_page(self, page: fitz.Page) -> bytes:
+        """
+        Render a single page and encode it as image.
+
+        Args:
+            page: PDF page
+
+        Returns:
+            Encoded image (output_format)
+        """
+        # Render oversized pages directly at the maximum size instead of
+        # rasterizing at full DPI and downscaling afterwards
+        zoom = min(self.zoom, self.max_dimension / max(page.rect.width, page.rect.height))
+
+        # Render page to pixmap (image); pages of equal size share a matrix
+        pix = page.get_pixmap(matrix=_zoom_matrix(zoom), alpha=False)
+
+        return self._encode_pixmap(pix)
+
+    def _make_encoder(self) -> Callable[[fitz.Pixmap], bytes]:
+        """
+        Build the pixmap encoder for the configured format and JPEG encoder.
+
+        Returns:
+            Function encoding a rendered pixmap (output_format)
+        """
+        max_dim = self.max_dimension
+        resampling_filter = self.resampling_filter
+        quality = self.jpeg_quality
+
+        def to_image(pix: fitz.Pixmap) -> Image.Image:
+            # Read the pixmap buffer in place instead of copying it first
+            img = Image.frombuffer(
+                "RGB", (pix.width, pix.height), pix.samples_mv, "raw", "RGB", 0, 1
+            )
+            # Resize in place if still too large (pixel rounding); no-op otherwise
+            img.thumbnail((max_dim, max_dim), resampling_filter)
+            return img
+
+        if self.output_format != "jpeg":
+            compress_level = self.png_compress_level
+
+            def encode_png_pil(pix: fitz.Pixmap) -> bytes:
+                buffer = io.BytesIO()
+                to_image(pix).save(buffer, "PNG", optimize=False, compress_level=compress_level)
+                return buffer.getvalue()
+
+            return encode_png_pil
+
+        if self.encoder == "turbojpeg":
+            turbojpeg = _get_turbojpeg()
+
+            def encode_jpeg_turbojpeg(pix: fitz.Pixmap) -> bytes:
+                # Pages that fit go from the pixmap buffer straight to the encoder
+                if max(pix.width, pix.height) <= max_dim:
+                    pixels = np.frombuffer(pix.samples_mv, dtype=np.uint8)
+                    pixels = pixels.reshape(pix.height, pix.width, 3)
+                else:
+                    pixels = np.asarray(to_image(pix))
+                # libjpeg-turbo's Huffman coding needs no extra optimize pass
+                return turbojpeg.encode(
+                    pixels,
+                    quality=quality,
+                    pixel_format=TJPF_RGB,
+                    jpeg_subsample=TJSAMP_420
+                )
+
+            return encode_jpeg_turbojpeg
+
+        if self.encoder == "jpegli":
+            command = [self._cjpegli, "-", "-", f"--quality={quality}"]
+
+            def encode_jpeg_jpegli(pix: fitz.Pixmap) -> bytes:
+                if max(pix.width, pix.height) <= max_dim:
+                    width, height, pixels = pix.width, pix.height, pix.samples_mv
+                else:
+                    img = to_image(pix)
+                    width, height, pixels = img.width, img.height, img.tobytes()
+                # Piped as PPM, no temp files
+                ppm = b"P6\n%d %d\n255\n" % (width, height) + pixels
+                result = subprocess.run(
+                    command,
+                    input=ppm,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    check=True
+                )
+                return result.stdout
+
+            return encode_jpeg_jpegli
+
+        optimize = self.jpeg_optimize
+
+        def encode_jpeg_pil(pix: fitz.Pixmap) -> bytes:
+            buffer = io.BytesIO()
+            # 4:2:0 chroma subsampling, baseline (non-progressive) encoding
+            to_image(pix).save(
+                buffer, "JPEG",
+                quality=quality,
+                optimize=optimize,
+                progressive=False,
+                subsampling=2
+            )
+            return buffer.getvalue()
+
+        return encode_jpeg_pil
 
     def convert_pdf_to_images(
         self,
-        pdf_path: Union[str, Path],
+        pdf_path: PdfSource,
         output_dir: Optional[Path] = None
     ) -> List[Path]:
         """
         Convert all pages of PDF to images.
 
         Args:
-            pdf_path: Path to PDF file
+            pdf_path: Path to PDF file, or its content as bytes/stream
             output_dir: Directory to save images (defaults to temp dir)
 
         Returns:
             List of paths to generated images
         """
-        pdf_path = Path(pdf_path)
-
         # Create output directory
-        if output_dir is None:
-            output_dir = Path(tempfile.mkdtemp(prefix="pdf_images_"))
-        else:
-            output_dir = Path(output_dir)
-            output_dir.mkdir(parents=True, exist_ok=True)
+        output_dir = _prepare_output_dir(output_dir)
 
-        image_paths = []
+        return self._convert(pdf_path, output_dir)
 
-        # Open PDF
-        doc = fitz.open(pdf_path)
+    def iter_pdf_pages(
+        self,
+        pdf_path: PdfSource,
+        output_dir: Optional[Path] = None
+    ) -> Iterator[Path]:
+        """
+        Convert pages of PDF to images one at a time.
 
-        try:
-            # Convert each page
-            for page_num in range(len(doc)):
-                page = doc[page_num]
+        Pages are rendered and written by a background thread, up to
+        PREFETCH_PAGES ahead of the caller, so processing a page (e.g. an LLM
+        request) overlaps with rendering the next ones. Each path is yielded
+        as soon as its own page is written. The PDF stays open until the
+        iterator is exhausted or closed.
 
-                # Render page to pixmap (image)
-                mat = fitz.Matrix(self.zoom, self.zoom)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
+        MuPDF runs on that background thread while the loop body runs.
+        PyMuPDF is not thread-safe: don't use fitz inside the loop.
 
-                # Convert to PIL Image for processing
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        Args:
+            pdf_path: Path to PDF file, or its content as bytes/stream
+            output_dir: Directory to save images (defaults to temp dir)
 
-                # Resize if too large
-                if max(img.width, img.height) > self.max_dimension:
-                    ratio = self.max_dimension / max(img.width, img.height)
-                    new_size = (int(img.width * ratio), int(img.height * ratio))
-                    img = img.resize(new_size, Image.Resampling.LANCZOS)
+        Yields:
+            Path to each generated image, in page order
+        """
+        output_dir = _prepare_output_dir(output_dir)
+        ready: queue.Queue = queue.Queue(maxsize=self.PREFETCH_PAGES)
+        stop = threading.Event()
+
+        with PdfDocument(pdf_path, self) as pdf:
+            producer = threading.Thread(
+                target=self._produce_pages,
+                args=(pdf.doc, output_dir, ready, stop),
+                daemon=True
+            )
+            producer.start()
+            try:
+                while True:
+                    item = ready.get()
+                    if item is None:
+                        return
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                # Stop the producer before the PDF is closed; draining the
+                # queue unblocks it if it is waiting for a free slot
+                stop.set()
+                while producer.is_alive():
+                    with contextlib.suppress(queue.Empty):
+                        ready.get_nowait()
+                    producer.join(0.01)
+
+    def _produce_pages(
+        self,
+        doc: fitz.Document,
+        output_dir: Path,
+        ready: queue.Queue,
+        stop: threading.Event
+    ) -> None:
+        """
+        Render and write all pages, passing each path to iter_pdf_pages.
 
-                # Save with format and quality settings
-                ext = "jpg" if self.output_format == "jpeg" else "png"
-                image_path = output_dir / f"page_{page_num + 1:04d}.{ext}"
+        Puts None when done, or the exception if a page fails.
+        """
+        try:
+            for page_num in range(doc.page_count):
+                if stop.is_set():
+                    return
+                image_path = self._page_path(output_dir, page_num)
+                image_path.write_bytes(self._encode_page(doc[page_num]))
+                ready.put(image_path)
+            ready.put(None)
+        except Exception as e:
+            ready.put(e)
+
+    def convert_pdf_to_image_bytes(self, pdf_path: PdfSource) -> List[bytes]:
+        """
+        Convert all pages of PDF to encoded images in memory.
 
-                if self.output_format == "jpeg":
-                    img.save(str(image_path), "JPEG", quality=self.jpeg_quality, optimize=True)
-                else:
-                    img.save(str(image_path), "PNG", optimize=True)
+        Args:
+            pdf_path: Path to PDF file, or its content as bytes/stream
 
-                image_paths.append(image_path)
+        Returns:
+            List of encoded page images (output_format), in page order
+        """
+        return self._convert(pdf_path, None)
 
-        finally:
-            doc.close()
+    def _convert(
+        self,
+        pdf_path: PdfSource,
+        output_dir: Optional[Path]
+    ) -> Union[List[Path], List[bytes]]:
+        """Convert all pages, to files in output_dir or to bytes if None."""
+        # Worker processes need a picklable source: read streams up front
+        if not isinstance(pdf_path, (str, Path, bytes)):
+            pdf_path = pdf_path.read()
 
-        return image_paths
+        # Open PDF
+        with PdfDocument(pdf_path, self) as pdf:
+            page_count = pdf.page_count()
+            workers = min(self.max_workers, page_count // self.MIN_PAGES_PER_WORKER)
+
+            # Small documents: convert each page in this process
+            if workers <= 1:
+                return self._convert_pages(pdf.doc, range(page_count), output_dir)
+
+        # Large documents: render contiguous page ranges in worker processes
+        chunk_size = math.ceil(page_count / workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _render_chunk, self, pdf_path, first,
+                    min(first + chunk_size, page_count), output_dir
+                )
+                for first in range(0, page_count, chunk_size)
+            ]
+            # Chunks are submitted in page order
+            return [result for future in futures for result in future.result()]
 
     def convert_pdf_page_to_image(
         self,
-        pdf_path: Union[str, Path],
+        pdf_path: PdfSource,
         page_num: int = 0,
         output_path: Optional[Path] = None
     ) -> Path:
@@ -105,15 +510,13 @@ class PdfToImageConverter:
         Convert a single PDF page to image.
 
         Args:
-            pdf_path: Path to PDF file
+            pdf_path: Path to PDF file, or its content as bytes/stream
             page_num: Page number (0-indexed)
             output_path: Output image path (defaults to temp file)
 
         Returns:
             Path to generated image
         """
-        pdf_path = Path(pdf_path)
-
         # Create output path
         if output_path is None:
             temp_file = tempfile.NamedTemporaryFile(
@@ -128,51 +531,86 @@ class PdfToImageConverter:
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Open PDF and convert page
-        doc = fitz.open(pdf_path)
+        with PdfDocument(pdf_path, self) as pdf:
+            output_path.write_bytes(pdf.render_page(page_num))
 
-        try:
-            if page_num >= len(doc):
-                raise ValueError(f"Page {page_num} does not exist in PDF (total pages: {len(doc)})")
+        return output_path
 
-            page = doc[page_num]
 
-            # Render page to pixmap
-            mat = fitz.Matrix(self.zoom, self.zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
+class PdfDocument:
+    """
+    An open PDF for several operations without re-parsing it each time.
 
-            # Convert to PIL Image for processing
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    Usage:
+        with PdfDocument("file.pdf") as pdf:
+            for page_num in range(pdf.page_count()):
+                image = pdf.render_page(page_num)
+    """
 
-            # Resize if too large
-            if max(img.width, img.height) > self.max_dimension:
-                ratio = self.max_dimension / max(img.width, img.height)
-                new_size = (int(img.width * ratio), int(img.height * ratio))
-                img = img.resize(new_size, Image.Resampling.LANCZOS)
+    def __init__(self, pdf_path: PdfSource, converter: Optional[PdfToImageConverter] = None):
+        """
+        Initialize PDF document.
 
-            # Save with format and quality settings
-            if self.output_format == "jpeg":
-                img.save(str(output_path), "JPEG", quality=self.jpeg_quality, optimize=True)
-            else:
-                img.save(str(output_path), "PNG", optimize=True)
+        Args:
+            pdf_path: Path to PDF file, or its content as bytes/stream
+            converter: Rendering settings (defaults to PdfToImageConverter())
+        """
+        self.pdf_path = pdf_path
+        self.converter = converter or PdfToImageConverter()
+        self.doc: Optional[fitz.Document] = None
+        self._stack = contextlib.ExitStack()
 
-        finally:
-            doc.close()
+    def __enter__(self) -> "PdfDocument":
+        self.doc = self._stack.enter_context(_open_pdf(self.pdf_path))
+        return self
 
-        return output_path
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self.doc = None
 
+    def page_count(self) -> int:
+        """Return the number of pages."""
+        return len(self.doc)
+
+    def render_page(self, page_num: int) -> bytes:
+        """
+        Render a single page to an encoded image.
+
+        Args:
+            page_num: Page number (0-indexed)
+
+        Returns:
+            Encoded image (converter's output_format)
+        """
+        if page_num >= len(self.doc):
+            raise ValueError(f"Page {page_num} does not exist in PDF (total pages: {len(self.doc)})")
 
-def get_pdf_page_count(pdf_path: Union[str, Path]) -> int:
+        return self.converter._encode_page(self.doc[page_num])
+
+    def render_all(self, output_dir: Optional[Path] = None) -> List[Path]:
+        """
+        Render all pages to images (in this process, reusing the open document).
+
+        Args:
+            output_dir: Directory to save images (defaults to temp dir)
+
+        Returns:
+            List of paths to generated images
+        """
+        output_dir = _prepare_output_dir(output_dir)
+
+        return self.converter._write_pages(self.doc, range(len(self.doc)), output_dir)
+
+
+def get_pdf_page_count(pdf_path: PdfSource) -> int:
     """
     Get number of pages in PDF.
 
     Args:
-        pdf_path: Path to PDF file
+        pdf_path: Path to PDF file, or its content as bytes/stream
 
     Returns:
         Number of pages
     """
-    doc = fitz.open(pdf_path)
-    try:
-        return len(doc)
-    finally:
-        doc.close()
+    with PdfDocument(pdf_path) as pdf:
+        return pdf.page_count()
@@ -0,0 +1,23 @@
+"""Tests for text file decoding on import."""
+
+import pytest
+
+from markconvert.converter import decode_text
+
+
+@pytest.mark.parametrize('data, expected', [
+    (b'# Plain ASCII', '# Plain ASCII'),
+    ('€ 5'.encode('utf-8'), '€ 5'),
+    ('€ 5'.encode('utf-8-sig'), '€ 5'),
+    ('# Grüße'.encode('utf-8-sig'), '# Grüße'),
+    ('café'.encode('cp1252'), 'café'),
+    ('# Überschrift … äöü ÄÖÜ ß.'.encode('cp1252'), '# Überschrift … äöü ÄÖÜ ß.'),
+    ('Grüße'.encode('latin-1'), 'Grüße'),
+])
+def test_decode_text(data, expected):
+    assert decode_text(data) == expected
+
+
+def test_decode_text_detects_other_encodings():
+    text = 'Привет мир, как дела? Всё хорошо. Сегодня хорошая погода, и мы пойдём гулять в парк.'
+    assert decode_text(text.encode('cp1251')) == text
@@ -0,0 +1,23 @@
+"""Tests for the Ollama client's response cleanup."""
+
+import pytest
+
+from markconvert.ollama_client import OllamaClient
+
+
+@pytest.mark.parametrize('text, expected', [
+    # ```markdown wrapper
+    ('```markdown\n# Titel\n\nText\n```', '# Titel\n\nText'),
+    # Bare and ```lang wrappers
+    ('```\n# Titel\n```', '# Titel'),
+    ('```python\nprint(1)\n```', 'print(1)'),
+    # Standalone fences in the middle of the body
+    ('# Titel\n```\nText\n  ```markdown  \nMehr', '# Titel\nText\nMehr'),
+    # Closing fence without a newline before it
+    ('```markdown\nText```', 'Text'),
+    # Inline backticks are kept
+    ('Mit `code` und ```inline``` Text', 'Mit `code` und ```inline``` Text'),
+])
+def test_remove_markdown_code_blocks(text, expected):
+    client = OllamaClient(cache_dir=False)
+    assert client._remove_markdown_code_blocks(text) == expected
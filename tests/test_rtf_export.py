@@ -0,0 +1,22 @@
+"""Tests for RTF export."""
+
+import pytest
+
+from markconvert.converter import MarkdownConverter
+
+
+@pytest.fixture
+def converter():
+    # RTF rendering uses no converter state: skip the OpenAI/Docling setup
+    return MarkdownConverter.__new__(MarkdownConverter)
+
+
+def test_escape_rtf(converter):
+    # Non-BMP characters become surrogate pairs, \uN values are signed 16-bit
+    assert converter._escape_rtf('ü😀{\\}') == '\\u252?\\u-10179?\\u-8704?\\{\\\\\\}'
+
+
+def test_render_rtf_numbered_list(converter):
+    lines = converter._render_rtf('10. item\n2. zwei').decode('utf-8').split('\n')
+    assert lines[-3] == r'\pard\fi-360\li720\sa80\sl240\slmult1 10.\tab item\par'
+    assert lines[-2] == r'\pard\fi-360\li720\sa80\sl240\slmult1 2.\tab zwei\par'